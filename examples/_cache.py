@@ -0,0 +1,66 @@
+"""Optional on-disk completion cache for the example scripts.
+
+Re-running an example during development re-issues every LLM call even
+though the (query, context) pairs have not changed. This module gives the
+examples an exact-match cache: results are keyed by model, temperature
+and blake2b digests of the query and context, and persisted with shelve
+so hits survive across runs and skip the network entirely.
+"""
+
+import hashlib
+import os
+import shelve
+
+_CACHE_PATH = os.path.expanduser("~/.rlm_cache")
+
+
+def context_hash(text):
+    """
+    Hash a (potentially large) context string.
+
+    Compute this once per document and pass it to the cached helpers so
+    repeated queries over the same context don't re-hash hundreds of KB.
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _key(rlm, query, context, ctx_hash=None):
+    """Build the exact-match cache key for one completion."""
+    return ":".join([
+        rlm.model,
+        str(rlm.llm_kwargs.get("temperature", "")),
+        ctx_hash or context_hash(context),
+        hashlib.blake2b(query.encode(), digest_size=16).hexdigest(),
+    ])
+
+
+def cached_complete(rlm, query, context, ctx_hash=None):
+    """Exact-match cached wrapper around rlm.complete."""
+    key = _key(rlm, query, context, ctx_hash)
+
+    with shelve.open(_CACHE_PATH) as db:
+        if key in db:
+            return db[key]
+
+    result = rlm.complete(query, context)
+
+    with shelve.open(_CACHE_PATH) as db:
+        db[key] = result
+
+    return result
+
+
+async def cached_acomplete(rlm, query, context, ctx_hash=None):
+    """Exact-match cached wrapper around rlm.acomplete."""
+    key = _key(rlm, query, context, ctx_hash)
+
+    with shelve.open(_CACHE_PATH) as db:
+        if key in db:
+            return db[key]
+
+    result = await rlm.acomplete(query, context)
+
+    with shelve.open(_CACHE_PATH) as db:
+        db[key] = result
+
+    return result
@@ -0,0 +1,117 @@
+"""Shared helpers for the example scripts."""
+
+import asyncio
+import functools
+import re
+
+try:  # Optional: single-pass multi-pattern scanning
+    import hyperscan as _hs
+except ImportError:
+    _hs = None
+
+
+@functools.lru_cache(maxsize=32)
+def _compiled_patterns(patterns):
+    """Compile a tuple of patterns once and reuse across scans."""
+    return [re.compile(p) for p in patterns]
+
+
+@functools.lru_cache(maxsize=32)
+def _hs_database(patterns):
+    """Build a Hyperscan database once per pattern set."""
+    db = _hs.Database()
+    exprs = [p.encode() for p in patterns]
+    db.compile(
+        expressions=exprs,
+        ids=list(range(len(exprs))),
+        flags=[_hs.HS_FLAG_DOTALL | _hs.HS_FLAG_SOM_LEFTMOST] * len(exprs),
+    )
+    return db
+
+
+def multiscan(patterns, text):
+    """
+    Scan text for several patterns, returning {pattern: [matches]}.
+
+    With hyperscan installed, all patterns are matched in a single O(N)
+    pass over the text; otherwise each pattern falls back to a cached
+    compiled re scan. Useful for the extraction-style examples that pull
+    dates, counts and currency out of the same document.
+    """
+    patterns = tuple(patterns)
+    results = {p: [] for p in patterns}
+
+    if _hs is not None:
+        data = text.encode()
+
+        def on_match(pat_id, start, end, flags, ctx):
+            results[patterns[pat_id]].append(data[start:end].decode())
+
+        _hs_database(patterns).scan(data, match_event_handler=on_match)
+    else:
+        for pattern, compiled in zip(patterns, _compiled_patterns(patterns)):
+            results[pattern] = compiled.findall(text)
+
+    return results
+
+
+@functools.lru_cache(maxsize=8)
+def _get_rlm_cached(kwargs_items):
+    # RLM (and therefore litellm) is imported lazily so this module stays
+    # cheap to import
+    from rlm import RLM
+
+    return RLM(**dict(kwargs_items))
+
+
+def get_rlm(**kwargs):
+    """
+    Memoized RLM factory.
+
+    Identical configurations share one instance (with its prompt and
+    response caches) across repeated main() runs and across examples in
+    the same process; RLM itself pools HTTP connections per event loop.
+    """
+    return _get_rlm_cached(tuple(sorted(kwargs.items())))
+
+
+async def run_queries(rlm, queries, context, max_concurrency=4, cache=False):
+    """
+    Run independent queries concurrently against the same context.
+
+    Each query is an independent LLM round-trip, so running them
+    sequentially pays N network latencies. Dispatching them with
+    asyncio.gather overlaps the I/O; the semaphore keeps concurrency
+    below typical provider rate limits.
+
+    Args:
+        rlm: RLM instance
+        queries: List of query strings
+        context: Shared context string
+        max_concurrency: Maximum in-flight requests
+        cache: If True, route calls through the on-disk completion cache
+
+    Returns:
+        List of results (or exceptions) in query order
+    """
+    # Queries and context travel as separate arguments; passing the document
+    # as its own query would duplicate it into every prompt
+    assert all(q is not context for q in queries)
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    if cache:
+        from _cache import cached_acomplete, context_hash
+
+        # Hash the shared context once, not once per query
+        ctx_hash = context_hash(context)
+
+        async def one(query):
+            async with sem:
+                return await cached_acomplete(rlm, query, context, ctx_hash)
+    else:
+        async def one(query):
+            async with sem:
+                return await rlm.acomplete(query, context)
+
+    return await asyncio.gather(*(one(q) for q in queries), return_exceptions=True)
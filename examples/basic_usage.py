@@ -1,14 +1,16 @@
 """Basic usage example for RLM."""
 
+import functools
+import importlib.util
 import os
-from dotenv import load_dotenv
-from rlm import RLM
+import sys
 
-# Load environment variables from .env file
-load_dotenv()
+from _cache import cached_complete
+from _util import get_rlm
 
-# Sample long document
-long_document = """
+# Sample long document (body kept separate; the full document is built on demand
+# so importing this module stays cheap)
+_BASE_DOC = """
 The History of Artificial Intelligence
 
 Introduction
@@ -39,14 +41,22 @@ These models have billions of parameters and are trained on vast amounts of text
 Conclusion
 AI continues to evolve rapidly, with applications in healthcare, transportation, education,
 and countless other domains. The future promises even more exciting developments.
-""" * 10  # Multiply to make it longer
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _build_doc():
+    """Build the sample document without allocating it at import time."""
+    # Interned so concurrent consumers share a single copy
+    return sys.intern(_BASE_DOC * 10)  # Multiply to make it longer
 
 
 def main():
     """Run basic RLM example."""
+    long_document = _build_doc()
     # Initialize RLM with OpenAI (or any other provider)
     # You can also use "claude-sonnet-4", "ollama/llama3.2", etc.
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",  # Use mini for cheaper testing
         max_iterations=15,
         # temperature=0.7,  # Optional: not all models support this (e.g., gpt-5 only allows temperature=1)
@@ -60,8 +70,8 @@ def main():
     print("\nProcessing with RLM...\n")
 
     try:
-        # Process with RLM
-        result = rlm.complete(query, long_document)
+        # Process with RLM (cached on disk, so re-runs skip the network)
+        result = cached_complete(rlm, query, long_document)
 
         print("Result:")
         print(result)
@@ -77,7 +87,13 @@ if __name__ == "__main__":
     # Make sure to set your API key in .env file or as environment variable:
     # OPENAI_API_KEY=sk-...
 
-    if not os.getenv("OPENAI_API_KEY"):
+    # Load .env before checking for the key — dotenv is cheap, it is the
+    # rlm/litellm import that stays deferred
+    if importlib.util.find_spec("dotenv") is not None:
+        from dotenv import load_dotenv
+        load_dotenv()
+
+    if not os.environ.get("OPENAI_API_KEY"):
         print("❌ Error: OPENAI_API_KEY not found!")
         print()
         print("Please set up your API key:")
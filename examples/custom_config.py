@@ -1,8 +1,9 @@
 """Example showing advanced configuration options."""
 
-from rlm import RLM
 import asyncio
 
+from _util import get_rlm
+
 # Sample context
 context = """
 Technical Specifications - Server Configuration
@@ -43,7 +44,7 @@ async def async_example():
     """Example using async API for better performance."""
     print("Async Example\n")
 
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",
         max_iterations=10,
         temperature=0.3
@@ -69,7 +70,7 @@ def custom_params_example():
     """Example with custom LLM parameters."""
     print("\nCustom Parameters Example\n")
 
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",
         max_iterations=15,
         max_depth=3,
@@ -93,7 +94,7 @@ def local_model_example():
     print("\nLocal Model Example (llama.cpp)\n")
 
     # Assumes llama.cpp server running on localhost:8000
-    rlm = RLM(
+    rlm = get_rlm(
         model="openai/local",
         api_base="http://localhost:8000/v1",
         max_iterations=10,
@@ -114,7 +115,7 @@ def error_handling_example():
     """Example with error handling."""
     print("\nError Handling Example\n")
 
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",
         max_iterations=3,  # Very low to trigger timeout
         max_depth=2
@@ -146,7 +147,7 @@ def stats_example():
     """Example tracking statistics."""
     print("\nStatistics Tracking Example\n")
 
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",
         max_iterations=15
     )
@@ -1,6 +1,12 @@
 """Example of extracting structured data from unstructured text."""
 
-from rlm import RLM
+import asyncio
+
+from _util import get_rlm, run_queries
+
+# Separator lines built once instead of per iteration
+SEP_EQ = "=" * 80
+SEP_DASH = "-" * 80
 
 # Unstructured document with embedded data
 document = """
@@ -39,7 +45,7 @@ Next meeting: February 15, 2025 at 2:00 PM
 
 def main():
     """Extract structured data using RLM."""
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",
         max_iterations=15,
         temperature=0.3  # Lower temp for more precise extraction
@@ -55,19 +61,20 @@ def main():
     ]
 
     print("Data Extraction Examples\n")
-    print("=" * 80)
+    print(SEP_EQ)
 
-    for task in tasks:
+    # Run all extraction tasks concurrently instead of one at a time
+    results = asyncio.run(run_queries(rlm, tasks, document, cache=True))
+
+    for task, result in zip(tasks, results):
         print(f"\nTask: {task}")
-        print("-" * 80)
+        print(SEP_DASH)
 
-        try:
-            result = rlm.complete(task, document)
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
+        else:
             print(f"Result:\n{result}")
 
-        except Exception as e:
-            print(f"Error: {e}")
-
         print()
 
 
@@ -1,18 +1,25 @@
 #!/usr/bin/env python
 """Quick demo of RLM functionality."""
 
-from rlm.repl import REPLExecutor
-from rlm.parser import extract_final, is_final
 import re
 
-print("=" * 60)
+from _util import multiscan
+
+# Separator lines built once instead of per print call
+SEP_EQ = "=" * 60
+SEP_DASH = "-" * 60
+
+print(SEP_EQ)
 print("RLM Library Demo")
-print("=" * 60)
+print(SEP_EQ)
 print()
 
 # Demo 1: REPL Execution
 print("1. REPL Executor Demo")
-print("-" * 60)
+print(SEP_DASH)
+
+# Imported lazily so `python demo.py --help`-style invocations stay fast
+from rlm.repl import REPLExecutor
 
 repl = REPLExecutor()
 
@@ -28,11 +35,15 @@ Q4 Revenue: $2.1M
 Total: $6.6M
 """
 
-env = {'context': context, 're': re}
+# Pre-compile the pattern once and hand the compiled object to the REPL,
+# so repeated executions skip re-parsing the pattern
+DOLLAR_M = re.compile(r'\$([\d.]+)M')
+
+env = {'context': context, 're': re, 'DOLLAR_M': DOLLAR_M, 'multiscan': multiscan}
 
 # Example 1: Extract all revenue numbers
 code1 = """
-revenues = re.findall(r'\\$([\\d.]+)M', context)
+revenues = DOLLAR_M.findall(context)
 print(f"Found revenues: {revenues}")
 """
 
@@ -55,9 +66,23 @@ result = repl.execute(code2, env)
 print("Output:", result)
 print()
 
+# Example 3: Scan for several patterns in one pass
+code3 = """
+found = multiscan([r'\\$[\\d.]+M', r'Q\\d'], context)
+print(f"Multi-pattern scan: {found}")
+"""
+
+print("Code:")
+print(code3)
+result = repl.execute(code3, env)
+print("Output:", result)
+print()
+
 # Demo 2: Parser
 print("2. Response Parser Demo")
-print("-" * 60)
+print(SEP_DASH)
+
+from rlm.parser import extract_final, is_final
 
 # Example LLM response with FINAL
 response = """
@@ -84,7 +109,7 @@ print()
 
 # Demo 3: Show how context is used
 print("3. Context as Variable Demo")
-print("-" * 60)
+print(SEP_DASH)
 
 print("Instead of passing context in the prompt like this:")
 print("  prompt = f'Context: {huge_document}\\n\\nQuestion: {query}'")
@@ -98,9 +123,9 @@ print("  - re.findall(pattern, context)  # Search")
 print("  - recursive_llm(query, context[1000:2000])  # Recurse")
 print()
 
-print("=" * 60)
+print(SEP_EQ)
 print("Demo Complete!")
-print("=" * 60)
+print(SEP_EQ)
 print()
 print("To use RLM with a real model:")
 print()
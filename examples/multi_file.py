@@ -1,6 +1,10 @@
 """Example processing multiple documents with shared context."""
 
-from rlm import RLM
+import asyncio
+import functools
+import sys
+
+from _util import get_rlm, run_queries
 
 # Simulate multiple related documents
 documents = {
@@ -83,18 +87,32 @@ Education Discount:
 }
 
 
+def _build_combined(docs):
+    """Concatenate documents with file markers via a single join."""
+    parts = []
+    for name, content in docs.items():
+        parts.append("\n\n--- FILE: ")
+        parts.append(name)
+        parts.append(" ---\n")
+        parts.append(content)
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=1)
+def _combined():
+    """Build the combined context lazily; repeat main() runs share one string."""
+    # Interned so concurrent consumers share a single copy
+    return sys.intern(_build_combined(documents))
+
+
 def main():
     """Process multiple documents."""
-    # Combine all documents
-    combined = "\n\n--- FILE: " + "\n\n--- FILE: ".join(
-        f"{name} ---\n{content}"
-        for name, content in documents.items()
-    )
+    combined = _combined()
 
     print(f"Processing {len(documents)} documents")
     print(f"Total size: {len(combined):,} characters\n")
 
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",
         max_iterations=15,
         temperature=0.5
@@ -109,16 +127,20 @@ def main():
         "If I'm a student, how much would Premium cost?",
     ]
 
-    for query in queries:
-        print(f"Query: {query}")
+    # All queries share the same combined context, so run them concurrently
+    results = asyncio.run(run_queries(rlm, queries, combined, cache=True))
 
-        try:
-            result = rlm.complete(query, combined)
-            print(f"Answer: {result}")
-            print(f"Stats: {rlm.stats['llm_calls']} calls\n")
+    # One buffered write per batch instead of several prints per query
+    out = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            out.append(f"Query: {query}\nError: {result}\n\n")
+        else:
+            out.append(f"Query: {query}\nAnswer: {result}\n\n")
 
-        except Exception as e:
-            print(f"Error: {e}\n")
+    stats = rlm.stats
+    out.append(f"Stats: {stats['llm_calls']} calls total\n")
+    sys.stdout.write("".join(out))
 
 
 if __name__ == "__main__":
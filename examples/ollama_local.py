@@ -1,6 +1,9 @@
 """Example using Ollama for local LLM."""
 
-from rlm import RLM
+import asyncio
+import sys
+
+from _util import get_rlm, run_queries
 
 # Sample document
 document = """
@@ -36,7 +39,7 @@ def main():
     # Initialize RLM with Ollama
     # Make sure Ollama is running: ollama serve
     # And you have a model installed: ollama pull llama3.2
-    rlm = RLM(
+    rlm = get_rlm(
         model="ollama/llama3.2",
         max_iterations=10,
         temperature=0.5
@@ -51,17 +54,20 @@ def main():
 
     print("Using Ollama (local LLM)\n")
 
-    for query in queries:
-        print(f"Query: {query}")
+    # Local inference is still latency-bound per call; overlap the queries
+    results = asyncio.run(run_queries(rlm, queries, document, cache=True))
 
-        try:
-            result = rlm.complete(query, document)
-            print(f"Answer: {result}")
-            print(f"Stats: {rlm.stats['llm_calls']} LLM calls, "
-                  f"{rlm.stats['iterations']} iterations\n")
+    # One buffered write per batch instead of several prints per query
+    out = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            out.append(f"Query: {query}\nError: {result}\n\n")
+        else:
+            out.append(f"Query: {query}\nAnswer: {result}\n\n")
 
-        except Exception as e:
-            print(f"Error: {e}\n")
+    stats = rlm.stats
+    out.append(f"Stats: {stats['llm_calls']} LLM calls total\n")
+    sys.stdout.write("".join(out))
 
 
 if __name__ == "__main__":
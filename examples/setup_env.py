@@ -38,36 +38,43 @@ def setup_env():
     if azure_key:
         azure_base = input("Azure API Base URL: ").strip()
 
-    # Write .env file
-    with open(env_file, 'w') as f:
-        f.write("# OpenAI API Key\n")
-        f.write(f"OPENAI_API_KEY={openai_key}\n")
-        f.write("\n")
-
-        if anthropic_key:
-            f.write("# Anthropic API Key\n")
-            f.write(f"ANTHROPIC_API_KEY={anthropic_key}\n")
-            f.write("\n")
-        else:
-            f.write("# Anthropic API Key (optional)\n")
-            f.write("# ANTHROPIC_API_KEY=your-anthropic-api-key-here\n")
-            f.write("\n")
-
-        if azure_key:
-            f.write("# Azure OpenAI\n")
-            f.write(f"AZURE_API_KEY={azure_key}\n")
-            if azure_base:
-                f.write(f"AZURE_API_BASE={azure_base}\n")
-            f.write("\n")
-        else:
-            f.write("# Azure OpenAI (optional)\n")
-            f.write("# AZURE_API_KEY=your-azure-api-key-here\n")
-            f.write("# AZURE_API_BASE=https://your-resource.openai.azure.com\n")
-            f.write("\n")
+    # Build the whole file in memory, then write it in one shot
+    lines = [
+        "# OpenAI API Key\n",
+        f"OPENAI_API_KEY={openai_key}\n",
+        "\n",
+    ]
+
+    if anthropic_key:
+        lines.append("# Anthropic API Key\n")
+        lines.append(f"ANTHROPIC_API_KEY={anthropic_key}\n")
+        lines.append("\n")
+    else:
+        lines.append("# Anthropic API Key (optional)\n")
+        lines.append("# ANTHROPIC_API_KEY=your-anthropic-api-key-here\n")
+        lines.append("\n")
+
+    if azure_key:
+        lines.append("# Azure OpenAI\n")
+        lines.append(f"AZURE_API_KEY={azure_key}\n")
+        if azure_base:
+            lines.append(f"AZURE_API_BASE={azure_base}\n")
+        lines.append("\n")
+    else:
+        lines.append("# Azure OpenAI (optional)\n")
+        lines.append("# AZURE_API_KEY=your-azure-api-key-here\n")
+        lines.append("# AZURE_API_BASE=https://your-resource.openai.azure.com\n")
+        lines.append("\n")
+
+    lines.append("# Other providers (optional)\n")
+    lines.append("# GEMINI_API_KEY=your-gemini-api-key-here\n")
+    lines.append("# COHERE_API_KEY=your-cohere-api-key-here\n")
 
-        f.write("# Other providers (optional)\n")
-        f.write("# GEMINI_API_KEY=your-gemini-api-key-here\n")
-        f.write("# COHERE_API_KEY=your-cohere-api-key-here\n")
+    # Write to a temp file and rename so an interrupted run can't leave
+    # a half-written .env behind
+    tmp_file = env_file.with_suffix(".tmp")
+    tmp_file.write_text("".join(lines))
+    os.replace(tmp_file, env_file)
 
     print()
     print("✅ .env file created successfully!")
@@ -78,6 +85,11 @@ def setup_env():
     print()
 
 
+def _mask(key):
+    """Mask an API key for display in a single f-string build."""
+    return f"{key[:7]}...{key[-4:]}" if key and len(key) > 11 else "***"
+
+
 def test_env():
     """Test if API keys are loaded."""
     from dotenv import load_dotenv
@@ -89,20 +101,14 @@ def test_env():
     print("=" * 60)
     print()
 
-    openai_key = os.getenv("OPENAI_API_KEY")
-    anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-
-    if openai_key:
-        masked = openai_key[:7] + "..." + openai_key[-4:] if len(openai_key) > 11 else "***"
-        print(f"✅ OPENAI_API_KEY: {masked}")
-    else:
-        print("❌ OPENAI_API_KEY: Not set")
-
-    if anthropic_key:
-        masked = anthropic_key[:7] + "..." + anthropic_key[-4:] if len(anthropic_key) > 11 else "***"
-        print(f"✅ ANTHROPIC_API_KEY: {masked}")
-    else:
-        print("⚠️  ANTHROPIC_API_KEY: Not set (optional)")
+    for name, required in [("OPENAI_API_KEY", True), ("ANTHROPIC_API_KEY", False)]:
+        key = os.environ.get(name)
+        if key:
+            print(f"✅ {name}: {_mask(key)}")
+        elif required:
+            print(f"❌ {name}: Not set")
+        else:
+            print(f"⚠️  {name}: Not set (optional)")
 
     print()
 
@@ -1,15 +1,13 @@
 """Example using two different models for cost optimization."""
 
-from rlm import RLM
+import asyncio
+import functools
+import sys
 
-# Very long document
-long_document = """
-Annual Financial Report 2024
-""" + "\n\n" + """
-Executive Summary:
-Our company achieved record revenue of $500M in 2024, representing 25% year-over-year growth.
-Net income reached $75M, with an operating margin of 18%.
-""" + "\n\n" + ("""
+from _util import get_rlm, run_queries
+
+# Repeated body built once, outside the document assembly
+_QUARTERLY_BLOCK = """
 Quarterly Performance:
 Q1 2024: Revenue $110M, Net Income $15M
 Q2 2024: Revenue $120M, Net Income $18M
@@ -22,14 +20,32 @@ Department Breakdown:
 - Marketing: $100M revenue, 50 employees
 - Operations: $50M revenue, 100 employees
 
-""" * 50)  # Repeat to make it very long
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _build_doc():
+    """Build the very long sample document on demand (one join, no import-time cost)."""
+    parts = [
+        """
+Annual Financial Report 2024
+""",
+        """
+Executive Summary:
+Our company achieved record revenue of $500M in 2024, representing 25% year-over-year growth.
+Net income reached $75M, with an operating margin of 18%.
+""",
+        _QUARTERLY_BLOCK * 50,  # Repeat to make it very long
+    ]
+    return sys.intern("\n\n".join(parts))
 
 
 def main():
     """Run RLM with two models."""
+    long_document = _build_doc()
     # Use GPT-4o for root decisions, GPT-4o-mini for recursive processing
     # This can significantly reduce costs while maintaining quality
-    rlm = RLM(
+    rlm = get_rlm(
         model="gpt-5-mini",                # Root model (expensive, smart)
         recursive_model="gpt-5-mini", # Recursive model (cheap, fast)
         max_iterations=15,
@@ -48,20 +64,20 @@ def main():
     print("  Recursive: gpt-5-mini (cheap, for sub-tasks)\n")
     print(f"Document length: {len(long_document):,} characters\n")
 
-    for query in queries:
-        print(f"Query: {query}")
-
-        try:
-            result = rlm.complete(query, long_document)
+    # Independent questions over the same document: dispatch concurrently
+    results = asyncio.run(run_queries(rlm, queries, long_document))
 
-            print(f"Answer: {result}")
-            print(f"Stats: {rlm.stats['llm_calls']} calls, "
-                  f"{rlm.stats['iterations']} iterations, "
-                  f"depth {rlm.stats['depth']}")
-            print()
+    # One buffered write per batch instead of several prints per query
+    out = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            out.append(f"Query: {query}\nError: {result}\n\n")
+        else:
+            out.append(f"Query: {query}\nAnswer: {result}\n\n")
 
-        except Exception as e:
-            print(f"Error: {e}\n")
+    stats = rlm.stats
+    out.append(f"Stats: {stats['llm_calls']} calls total\n")
+    sys.stdout.write("".join(out))
 
 
 if __name__ == "__main__":
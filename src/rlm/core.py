@@ -1,15 +1,32 @@
 """Core RLM implementation."""
 
 import asyncio
+import hashlib
+import json
 import re
+import threading
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
 from typing import Optional, Dict, Any, List
 
+import httpx
 import litellm
 
+try:  # Optional: ~5-10x faster serialization for cache keys
+    import orjson
+except ImportError:
+    orjson = None
+
 from .types import Message
 from .repl import REPLExecutor, REPLError
 from .prompts import build_system_prompt
-from .parser import parse_response, is_final
+from .parser import try_extract_final, has_complete_final
+
+
+# Current recursion depth, tracked per task context instead of per RLM
+# instance so one object serves every level of the tree
+_DEPTH: ContextVar[int] = ContextVar('rlm_depth', default=0)
 
 
 class RLMError(Exception):
@@ -27,9 +44,100 @@ class MaxDepthError(RLMError):
     pass
 
 
+class _LRUCache(OrderedDict):
+    """Bounded mapping with least-recently-used eviction.
+
+    Keeps the process-wide response cache from growing without limit
+    over a long session; reads refresh recency, writes evict the
+    oldest entry past maxsize.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key: str, value: str) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
 class RLM:
     """Recursive Language Model."""
 
+    # Shared background event loop for running recursive coroutines from the
+    # synchronous REPL while an outer loop is active. Created lazily on first
+    # use and kept for the life of the process (the thread is a daemon), so
+    # recursive calls reuse one loop and its connections instead of paying
+    # thread + loop + client setup per call.
+    _bg_loop: Optional[asyncio.AbstractEventLoop] = None
+    _bg_loop_lock = threading.Lock()
+
+    # Shared exact-match response cache for deterministic (temperature=0)
+    # calls; repeated sub-queries over the same chunk skip the network
+    _response_cache: Dict[str, str] = _LRUCache(maxsize=1024)
+
+    # Pooled HTTP clients with keep-alive, installed as litellm's async
+    # session just before each call so requests reuse connections instead
+    # of paying a TCP + TLS handshake each time. Keep-alive connections
+    # are bound to the loop that created them, so there is one client per
+    # event loop (weakly keyed, letting dead loops' clients be
+    # collected). litellm's client= kwarg expects a provider client
+    # object, so the session hook is the right seam.
+    _http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _http_client_lock = threading.Lock()
+
+    # Shared stateless REPL executor (created by the first RLM)
+    _shared_repl: Optional[REPLExecutor] = None
+
+    @classmethod
+    def _get_bg_loop(cls) -> asyncio.AbstractEventLoop:
+        """Get (lazily starting) the shared background event loop."""
+        if cls._bg_loop is None:
+            with cls._bg_loop_lock:
+                if cls._bg_loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(
+                        target=loop.run_forever,
+                        name="rlm-recursive-loop",
+                        daemon=True,
+                    )
+                    thread.start()
+                    cls._bg_loop = loop
+        return cls._bg_loop
+
+    @classmethod
+    def _bind_http_client(cls) -> None:
+        """Point litellm's session at a pooled client for the current loop."""
+        with cls._http_client_lock:
+            session = litellm.aclient_session
+            if session is not None and session not in cls._http_clients.values():
+                # The caller installed their own session (e.g. an
+                # app-level pool): respect it and manage nothing
+                return
+
+            loop = asyncio.get_running_loop()
+            client = cls._http_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=64,
+                        max_keepalive_connections=32,
+                    ),
+                )
+                cls._http_clients[loop] = client
+            if session is not client:
+                litellm.aclient_session = client
+
     def __init__(
         self,
         model: str,
@@ -38,7 +146,11 @@ class RLM:
         api_key: Optional[str] = None,
         max_depth: int = 5,
         max_iterations: int = 30,
-        _current_depth: int = 0,
+        max_concurrency: int = 16,
+        stream: bool = False,
+        context_binary: bool = False,
+        cache_system_prompt: bool = True,
+        cache: Optional[Dict[str, str]] = None,
         **llm_kwargs: Any
     ):
         """
@@ -51,7 +163,19 @@ class RLM:
             api_key: Optional API key
             max_depth: Maximum recursion depth
             max_iterations: Maximum REPL iterations per call
-            _current_depth: Internal current depth tracker
+            max_concurrency: Maximum concurrent completions for batch
+                calls (recursive_llm_batch, acomplete_batch)
+            stream: Stream responses and stop reading as soon as a
+                complete FINAL()/FINAL_VAR() statement arrives
+            context_binary: Store ASCII contexts as bytes in the REPL env
+                (halves memory traffic for slice-heavy exploration; a
+                context_str fallback stays available for str-only regexes)
+            cache_system_prompt: Mark the system prompt cacheable for
+                providers with explicit prefix caching (Anthropic
+                cache_control); OpenAI-style providers prefix-cache
+                automatically as long as the prefix is stable
+            cache: Optional mapping used as the response cache for
+                temperature=0 calls (defaults to a process-wide dict)
             **llm_kwargs: Additional LiteLLM parameters
         """
         self.model = model
@@ -60,10 +184,26 @@ class RLM:
         self.api_key = api_key
         self.max_depth = max_depth
         self.max_iterations = max_iterations
-        self._current_depth = _current_depth
+        self.max_concurrency = max_concurrency
+        self.stream = stream
+        self.context_binary = context_binary
+        self.cache_system_prompt = cache_system_prompt
+        self._cache = self._response_cache if cache is None else cache
         self.llm_kwargs = llm_kwargs
 
-        self.repl = REPLExecutor()
+        # One executor serves every RLM and every recursion depth: it
+        # holds no per-request state now that output goes through the
+        # PrintCollector rather than a redirected stdout
+        if RLM._shared_repl is None:
+            RLM._shared_repl = REPLExecutor()
+        self.repl = RLM._shared_repl
+
+        # Static part of the REPL env, built once and copied per request;
+        # per-request entries (context, query, recursive fns) are layered
+        # on top of the copy
+        self._env_template: Dict[str, Any] = {
+            're': re,  # Whitelist re module
+        }
 
         # Stats
         self._llm_calls = 0
@@ -138,31 +278,92 @@ class RLM:
         if query and not context:
             context = query
             query = ""
-        if self._current_depth >= self.max_depth:
+
+        return await self._acomplete_at_depth(
+            query, context, _DEPTH.get(), **kwargs
+        )
+
+    async def _acomplete_at_depth(
+        self,
+        query: str,
+        context: str,
+        depth: int,
+        **kwargs: Any
+    ) -> str:
+        """
+        Run one completion at an explicit recursion depth.
+
+        Depth is threaded through as a parameter so recursive calls reuse
+        this RLM (and its REPL executor, caches and HTTP client) instead
+        of constructing a fresh instance per sub-query.
+
+        Args:
+            query: User query
+            context: Context to process
+            depth: Recursion depth for this completion
+            **kwargs: Additional LiteLLM parameters
+
+        Returns:
+            Final answer string
+        """
+        if depth >= self.max_depth:
             raise MaxDepthError(f"Max recursion depth ({self.max_depth}) exceeded")
 
+        # Publish this completion's depth for the duration of the call so
+        # nested acomplete() entry points and stats observe it
+        depth_token = _DEPTH.set(depth)
+        try:
+            return await self._run_completion(query, context, depth, **kwargs)
+        finally:
+            _DEPTH.reset(depth_token)
+
+    async def _run_completion(
+        self,
+        query: str,
+        context: str,
+        depth: int,
+        **kwargs: Any
+    ) -> str:
+        """Body of a single completion at a fixed depth."""
         # Initialize REPL environment
-        repl_env = self._build_repl_env(query, context)
+        repl_env = self._build_repl_env(query, context, depth)
 
         # Build initial messages
-        system_prompt = build_system_prompt(len(context), self._current_depth)
+        system_prompt = build_system_prompt(
+            len(context),
+            depth,
+            binary=isinstance(repl_env['context'], bytes),
+        )
+        # Anthropic models support explicit prefix caching; mark the system
+        # prompt (the large stable prefix) as cacheable so each iteration
+        # only pays prefill for the delta tokens
+        model_in_use = self.model if depth == 0 else self.recursive_model
+        system_content: Any = system_prompt
+        if self.cache_system_prompt and model_in_use.startswith(('claude', 'anthropic')):
+            system_content = [{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"},
+            }]
+
         messages: List[Message] = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": system_content},
             {"role": "user", "content": query}
         ]
 
-        # Main loop
+        # Main loop. Provider-side prefix caching only hits if the prefix
+        # stays byte-for-byte identical across iterations, so the loop
+        # only ever appends to messages; a test pins that invariant.
         for iteration in range(self.max_iterations):
             self._iterations = iteration + 1
 
             # Call LLM
-            response = await self._call_llm(messages, **kwargs)
+            response = await self._call_llm(messages, depth=depth, **kwargs)
 
-            # Check for FINAL
-            if is_final(response):
-                answer = parse_response(response, repl_env)
-                if answer is not None:
-                    return answer
+            # Check for FINAL (single scan: detection and extraction fused)
+            answer = try_extract_final(response, repl_env)
+            if answer is not None:
+                return answer
 
             # Execute code in REPL
             try:
@@ -180,9 +381,61 @@ class RLM:
             f"Max iterations ({self.max_iterations}) exceeded without FINAL()"
         )
 
+    def complete_batch(
+        self,
+        items: List[Any],
+        max_concurrency: Optional[int] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Sync wrapper for acomplete_batch.
+
+        Args:
+            items: List of (query, context) tuples
+            max_concurrency: Maximum completions in flight at once
+                (defaults to the instance setting)
+            **kwargs: Additional LiteLLM parameters
+
+        Returns:
+            List of final answers in input order
+        """
+        return asyncio.run(
+            self.acomplete_batch(items, max_concurrency=max_concurrency, **kwargs)
+        )
+
+    async def acomplete_batch(
+        self,
+        items: List[Any],
+        max_concurrency: Optional[int] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Process several independent (query, context) pairs concurrently.
+
+        Throughput scales near-linearly up to the provider's concurrency
+        limit, and every completion reuses the shared pooled HTTP client.
+
+        Args:
+            items: List of (query, context) tuples
+            max_concurrency: Maximum completions in flight at once
+                (defaults to the instance setting)
+            **kwargs: Additional LiteLLM parameters
+
+        Returns:
+            List of final answers in input order
+        """
+        sem = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def one(query: str, context: str) -> str:
+            async with sem:
+                return await self.acomplete(query, context, **kwargs)
+
+        return await asyncio.gather(*(one(q, c) for q, c in items))
+
     async def _call_llm(
         self,
         messages: List[Message],
+        depth: int = 0,
         **kwargs: Any
     ) -> str:
         """
@@ -190,15 +443,14 @@ class RLM:
 
         Args:
             messages: Conversation messages
+            depth: Recursion depth of the calling completion
             **kwargs: Additional parameters (can override model here)
 
         Returns:
             LLM response text
         """
-        self._llm_calls += 1
-
         # Choose model based on depth
-        default_model = self.model if self._current_depth == 0 else self.recursive_model
+        default_model = self.model if depth == 0 else self.recursive_model
 
         # Allow override via kwargs
         model = kwargs.pop('model', default_model)
@@ -210,41 +462,140 @@ class RLM:
         if self.api_key:
             call_kwargs['api_key'] = self.api_key
 
-        # Call LiteLLM
+        # Reuse pooled connections for whichever loop this call runs on
+        self._bind_http_client()
+
+        # Deterministic calls are cacheable: identical prompts recur often
+        # at depth > 0 when the same chunk is re-queried
+        cache_key = None
+        if call_kwargs.get('temperature') == 0:
+            payload = [model, messages, sorted(call_kwargs.items())]
+            if orjson is not None:
+                raw = orjson.dumps(payload, default=str, option=orjson.OPT_SORT_KEYS)
+            else:
+                raw = json.dumps(payload, sort_keys=True, default=str).encode()
+            # blake2b beats sha256 at prompt-sized inputs, and 16 bytes
+            # is plenty for an in-process cache key
+            cache_key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        self._llm_calls += 1
+
+        if call_kwargs.pop('stream', self.stream):
+            text = await self._stream_llm(model, messages, call_kwargs)
+        else:
+            # Call LiteLLM
+            response = await litellm.acompletion(
+                model=model,
+                messages=messages,
+                **call_kwargs
+            )
+
+            # Extract text
+            text = response.choices[0].message.content
+
+        if cache_key is not None:
+            self._cache[cache_key] = text
+
+        return text
+
+    async def _stream_llm(
+        self,
+        model: str,
+        messages: List[Message],
+        call_kwargs: Dict[str, Any]
+    ) -> str:
+        """
+        Stream an LLM response, stopping early on a complete final statement.
+
+        When the model emits FINAL("...") near the start of a long
+        response, the remaining tokens are wasted latency and billing;
+        close the stream as soon as the answer is complete.
+
+        Args:
+            model: Model name
+            messages: Conversation messages
+            call_kwargs: Remaining LiteLLM parameters
+
+        Returns:
+            Accumulated response text
+        """
         response = await litellm.acompletion(
             model=model,
             messages=messages,
+            stream=True,
             **call_kwargs
         )
 
-        # Extract text
-        return response.choices[0].message.content
+        parts: List[str] = []
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
 
-    def _build_repl_env(self, query: str, context: str) -> Dict[str, Any]:
+            # Cheap gate before re-scanning the accumulated buffer
+            if 'FINAL' in delta or ')' in delta:
+                if has_complete_final(''.join(parts)):
+                    aclose = getattr(response, 'aclose', None)
+                    if aclose is not None:
+                        await aclose()
+                    break
+
+        return ''.join(parts)
+
+    def _build_repl_env(
+        self,
+        query: str,
+        context: str,
+        depth: int = 0,
+    ) -> Dict[str, Any]:
         """
         Build REPL environment.
 
         Args:
             query: User query
             context: Context string
+            depth: Recursion depth of the calling completion
 
         Returns:
             Environment dict
         """
-        env: Dict[str, Any] = {
-            'context': context,
-            'query': query,
-            'recursive_llm': self._make_recursive_fn(),
-            're': re,  # Whitelist re module
-        }
+        recursive_llm, recursive_llm_batch = self._make_recursive_fn(depth)
+        env = self._env_template.copy()
+        env.update(
+            context=context,
+            query=query,
+            recursive_llm=recursive_llm,
+            recursive_llm_batch=recursive_llm_batch,
+        )
+
+        if self.context_binary:
+            if isinstance(context, bytes):
+                # Recursive sub-contexts arrive as slices of the bytes
+                # context and are already encoded
+                env['context_view'] = memoryview(context)
+                env['context_str'] = context.decode('ascii')
+            elif context.isascii():
+                # bytes slices move half the memory of str slices for
+                # ASCII data, and a memoryview makes them zero-copy
+                env['context'] = context.encode('ascii')
+                env['context_view'] = memoryview(env['context'])
+                env['context_str'] = context
+
         return env
 
-    def _make_recursive_fn(self) -> Any:
+    def _make_recursive_fn(self, depth: int = 0) -> Any:
         """
-        Create recursive LLM function for REPL.
+        Create recursive LLM functions for REPL.
+
+        Args:
+            depth: Recursion depth of the calling completion
 
         Returns:
-            Async function that can be called from REPL
+            Tuple of (recursive_llm, recursive_llm_batch) sync functions
         """
         async def recursive_llm(sub_query: str, sub_context: str) -> str:
             """
@@ -257,43 +608,99 @@ class RLM:
             Returns:
                 Answer from recursive call
             """
-            if self._current_depth + 1 >= self.max_depth:
+            if depth + 1 >= self.max_depth:
                 return f"Max recursion depth ({self.max_depth}) reached"
 
-            # Create sub-RLM with increased depth
-            sub_rlm = RLM(
-                model=self.recursive_model,
-                recursive_model=self.recursive_model,
-                api_base=self.api_base,
-                api_key=self.api_key,
-                max_depth=self.max_depth,
-                max_iterations=self.max_iterations,
-                _current_depth=self._current_depth + 1,
-                **self.llm_kwargs
+            # Reuse this RLM at increased depth: a sub-completion differs
+            # from its parent only in depth, so constructing a fresh RLM
+            # (executor, counters, pooled client lookup) per call was
+            # pure overhead
+            return await self._acomplete_at_depth(
+                sub_query, sub_context, depth + 1
             )
 
-            return await sub_rlm.acomplete(sub_query, sub_context)
-
-        # Wrap in sync function for REPL compatibility
+        # Wrap in sync functions for REPL compatibility. The execution
+        # strategy is resolved per call (see _run_coroutine_sync): nested
+        # recursion hops threads, so it cannot be bound once here.
         def sync_recursive_llm(sub_query: str, sub_context: str) -> str:
             """Sync wrapper for recursive_llm."""
-            # Check if we're in an async context
-            try:
-                loop = asyncio.get_running_loop()
-                # We're in async context, but REPL is sync
-                # Create a new thread to run async code
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        recursive_llm(sub_query, sub_context)
-                    )
-                    return future.result()
-            except RuntimeError:
-                # No running loop, safe to use asyncio.run
-                return asyncio.run(recursive_llm(sub_query, sub_context))
+            return self._run_coroutine_sync(recursive_llm(sub_query, sub_context))
+
+        async def recursive_llm_batch(pairs: List[Any]) -> List[str]:
+            """
+            Process several (sub_query, sub_context) pairs concurrently.
+
+            Args:
+                pairs: List of (sub_query, sub_context) tuples
 
-        return sync_recursive_llm
+            Returns:
+                List of answers in input order
+            """
+            # Bounded fanout: unbounded gather over hundreds of chunks
+            # would stampede the provider and trip rate limits
+            sem = asyncio.Semaphore(self.max_concurrency)
+
+            async def one(q: str, c: str) -> str:
+                async with sem:
+                    return await recursive_llm(q, c)
+
+            return await asyncio.gather(*(one(q, c) for q, c in pairs))
+
+        def sync_recursive_llm_batch(pairs: List[Any]) -> List[str]:
+            """Sync wrapper for recursive_llm_batch."""
+            return self._run_coroutine_sync(recursive_llm_batch(list(pairs)))
+
+        return sync_recursive_llm, sync_recursive_llm_batch
+
+    def _run_coroutine_sync(self, coro: Any) -> Any:
+        """
+        Run a recursion coroutine to completion from synchronous REPL code.
+
+        The right strategy depends on which thread is executing, so it is
+        chosen per call:
+
+        - No running loop: plain asyncio.run.
+        - Under an outer loop (which is blocked on this REPL step): hand
+          the coroutine to the shared background loop.
+        - Already on the background loop's own thread (nested recursion):
+          the background loop is blocked on this REPL step, so a
+          threadsafe future submitted to it would never run — execute on
+          a short-lived thread with its own loop instead.
+        """
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        bg_loop = self._get_bg_loop()
+        if current is not bg_loop:
+            return asyncio.run_coroutine_threadsafe(coro, bg_loop).result()
+
+        box: Dict[str, Any] = {}
+
+        def _runner() -> None:
+            try:
+                box['result'] = asyncio.run(coro)
+            except BaseException as exc:  # Re-raised on the calling thread
+                box['error'] = exc
+
+        thread = threading.Thread(target=_runner, name="rlm-nested-recursion")
+        thread.start()
+        thread.join()
+
+        if 'error' in box:
+            raise box['error']
+        return box['result']
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client owned by the current event loop."""
+        cls = type(self)
+        with cls._http_client_lock:
+            client = cls._http_clients.pop(asyncio.get_running_loop(), None)
+            if client is not None and litellm.aclient_session is client:
+                litellm.aclient_session = None
+        if client is not None:
+            await client.aclose()
 
     @property
     def stats(self) -> Dict[str, int]:
@@ -301,5 +708,5 @@ class RLM:
         return {
             'llm_calls': self._llm_calls,
             'iterations': self._iterations,
-            'depth': self._current_depth,
+            'depth': _DEPTH.get(),
         }
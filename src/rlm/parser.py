@@ -3,6 +3,26 @@
 import re
 from typing import Optional, Dict, Any
 
+# Patterns compiled once at import; these run on every LLM response.
+# Triple-quote patterns must stay ahead of the single-quote ones: the
+# single-quote patterns happily match an empty group at the opening of
+# a triple-quoted answer, so trying them first would swallow it.
+_FINAL_PATTERNS = [
+    re.compile(r'FINAL\s*\(\s*"""(.*)"""', re.DOTALL),  # FINAL("""answer""") - triple double quotes
+    re.compile(r"FINAL\s*\(\s*'''(.*)'''", re.DOTALL),  # FINAL('''answer''') - triple single quotes
+    re.compile(r'FINAL\s*\(\s*"([^"]*)"'),  # FINAL("answer") - double quotes
+    re.compile(r"FINAL\s*\(\s*'([^']*)'"),  # FINAL('answer') - single quotes
+]
+
+_FINAL_VAR_RE = re.compile(r'FINAL_VAR\s*\(\s*(\w+)\s*\)')
+
+# Cheap detection of either final form
+_FINAL_ANY_RE = re.compile(r'FINAL(?:_VAR)?\s*\(')
+
+# Opening delimiter of a FINAL() answer; triple quotes must come before
+# single ones so the longest delimiter wins
+_FINAL_OPEN_RE = re.compile(r'FINAL\s*\(\s*("""|\'\'\'|"|\')')
+
 
 def extract_final(response: str) -> Optional[str]:
     """
@@ -14,16 +34,18 @@ def extract_final(response: str) -> Optional[str]:
     Returns:
         Extracted answer or None if not found
     """
+    # Cheap substring gate: most responses are plain code with no final
+    # statement, and str.find is far cheaper than four regex searches
+    # (two of them DOTALL). Slicing to the tail also keeps the DOTALL
+    # scans off the bulk of long responses.
+    idx = response.find('FINAL')
+    if idx == -1:
+        return None
+    tail = response[idx:]
+
     # Look for FINAL("answer") or FINAL('answer')
-    patterns = [
-        r'FINAL\s*\(\s*"""(.*)"""',  # FINAL("""answer""") - triple double quotes
-        r"FINAL\s*\(\s*'''(.*)'''",  # FINAL('''answer''') - triple single quotes
-        r'FINAL\s*\(\s*"([^"]*)"',  # FINAL("answer") - double quotes
-        r"FINAL\s*\(\s*'([^']*)'",  # FINAL('answer') - single quotes
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, response, re.DOTALL)
+    for pattern in _FINAL_PATTERNS:
+        match = pattern.search(tail)
         if match:
             return match.group(1).strip()
 
@@ -42,7 +64,7 @@ def extract_final_var(response: str, env: Dict[str, Any]) -> Optional[str]:
         Variable value as string or None if not found
     """
     # Look for FINAL_VAR(var_name)
-    match = re.search(r'FINAL_VAR\s*\(\s*(\w+)\s*\)', response)
+    match = _FINAL_VAR_RE.search(response)
     if not match:
         return None
 
@@ -66,7 +88,68 @@ def is_final(response: str) -> bool:
     Returns:
         True if response contains final statement
     """
-    return 'FINAL(' in response or 'FINAL_VAR(' in response
+    return _FINAL_ANY_RE.search(response) is not None
+
+
+def has_complete_final(response: str) -> bool:
+    """
+    Check if response already contains a complete final statement.
+
+    Unlike is_final, this only returns True once the FINAL("...") answer
+    (or a FINAL_VAR reference) is fully present, so streaming callers can
+    stop reading the moment the answer is closed off.
+
+    Delimiter-aware on purpose: for a partially streamed triple-quoted
+    answer, the plain double-quote pattern would match an empty answer
+    between the first two quotes, truncating the answer mid-stream.
+    Completeness here means the opening quote after FINAL( has its
+    matching closer.
+
+    Args:
+        response: Accumulated LLM response text
+
+    Returns:
+        True if a complete final statement is present
+    """
+    pos = response.find('FINAL')
+    while pos != -1:
+        tail = response[pos:]
+        if _FINAL_VAR_RE.match(tail):
+            return True
+        match = _FINAL_OPEN_RE.match(tail)
+        if match and tail.find(match.group(1), match.end()) != -1:
+            return True
+        pos = response.find('FINAL', pos + 1)
+
+    return False
+
+
+def try_extract_final(response: str, env: Dict[str, Any]) -> Optional[str]:
+    """
+    Detect and extract a final statement in one pass.
+
+    Fuses is_final() + parse_response() so callers scan the response
+    once per iteration instead of twice.
+
+    Args:
+        response: LLM response text
+        env: REPL environment
+
+    Returns:
+        Final answer or None
+    """
+    # One find() covers both forms ('FINAL_VAR' contains 'FINAL'), so a
+    # response with neither skips every regex
+    idx = response.find('FINAL')
+    if idx == -1:
+        return None
+    tail = response[idx:]
+
+    answer = extract_final(tail)
+    if answer is not None:
+        return answer
+
+    return extract_final_var(tail, env)
 
 
 def parse_response(response: str, env: Dict[str, Any]) -> Optional[str]:
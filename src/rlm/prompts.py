@@ -1,27 +1,22 @@
 """System prompt templates for RLM."""
 
+from functools import lru_cache
+from typing import Dict
 
-def build_system_prompt(context_size: int, depth: int = 0) -> str:
-    """
-    Build system prompt for RLM.
-
-    Args:
-        context_size: Size of context in characters
-        depth: Current recursion depth
+# One template per language, selected at call time. Keeping every
+# variant in a single table means one module to import and one place
+# where wording can drift. Placeholders: {context_size}, {context_type},
+# {depth}. Only 'en' ships today; new languages are a dict entry away.
+_EN_TEMPLATE = """You are a Recursive Language Model. You interact with context through a Python REPL environment.
 
-    Returns:
-        System prompt string
-    """
-    # Minimal prompt (paper-style)
-    prompt = f"""You are a Recursive Language Model. You interact with context through a Python REPL environment.
-
-The context is stored in variable `context` (not in this prompt). Size: {context_size:,} characters.
+The context is stored in variable `context` (not in this prompt). Size: ~{context_size:,} characters.
 IMPORTANT: You cannot see the context directly. You MUST write Python code to search and explore it.
 
 Available in environment:
-- context: str (the document to analyze)
+- context: {context_type} (the document to analyze)
 - query: str (the question)
 - recursive_llm(sub_query, sub_context) -> str (recursively process sub-context)
+- recursive_llm_batch(pairs) -> list[str] (process [(sub_query, sub_context), ...] concurrently; much faster than calling recursive_llm in a loop)
 - re: already imported regex module (use re.findall, re.search, etc.)
 
 Write Python code to answer the query. The last expression or print() output will be shown to you.
@@ -36,9 +31,66 @@ Only use FINAL("answer") after you have found concrete evidence in the context.
 
 Depth: {depth}"""
 
+_EN_BINARY_NOTE = """
+
+NOTE: context is bytes (ASCII). Use b'...' patterns with re, or use context_str (a str copy) when needed; context_view is a zero-copy memoryview."""
+
+PROMPTS: Dict[str, str] = {
+    'en': _EN_TEMPLATE,
+}
+
+_BINARY_NOTES: Dict[str, str] = {
+    'en': _EN_BINARY_NOTE,
+}
+
+
+@lru_cache(maxsize=1024)
+def _build_system_prompt_cached(
+    size_bucket: int,
+    depth: int,
+    binary: bool,
+    lang: str,
+) -> str:
+    """Format (and memoize) the prompt for one (bucket, depth, lang) key."""
+    prompt = PROMPTS[lang].format(
+        context_size=size_bucket,
+        context_type="bytes" if binary else "str",
+        depth=depth,
+    )
+
+    if binary:
+        prompt += _BINARY_NOTES[lang]
+
     return prompt
 
 
+def build_system_prompt(
+    context_size: int,
+    depth: int = 0,
+    binary: bool = False,
+    lang: str = 'en',
+) -> str:
+    """
+    Build system prompt for RLM.
+
+    The result is memoized: context_size is bucketed to the nearest KiB
+    (the prompt shows it as approximate) so near-identical contexts share
+    one cached string, which also guarantees iterations reuse the exact
+    same prompt object for provider prefix caching.
+
+    Args:
+        context_size: Size of context in characters
+        depth: Current recursion depth
+        binary: Whether context is exposed as bytes
+        lang: Prompt language (a key of PROMPTS)
+
+    Returns:
+        System prompt string
+    """
+    size_bucket = max(1024, ((context_size + 1023) // 1024) * 1024)
+    return _build_system_prompt_cached(size_bucket, depth, binary, lang)
+
+
 def build_user_prompt(query: str) -> str:
     """
     Build user prompt.
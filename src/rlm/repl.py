@@ -1,9 +1,15 @@
 """Safe REPL executor using RestrictedPython."""
 
-import io
-import sys
+import ast
+import json
+import math
+import operator
+import re
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any, Optional
-from RestrictedPython import compile_restricted_exec, safe_globals, limited_builtins, utility_builtins
+from RestrictedPython import compile_restricted_exec, compile_restricted_eval, safe_globals, limited_builtins, utility_builtins
 from RestrictedPython.Guards import guarded_iter_unpack_sequence, safer_getattr
 from RestrictedPython.PrintCollector import PrintCollector
 
@@ -13,6 +19,243 @@ class REPLError(Exception):
     pass
 
 
+# Fence patterns compiled once at import; these run on every iteration.
+# A ```python fence is preferred over a bare ``` fence, matching the old
+# find()-based behaviour, but each form now costs a single scan.
+_PY_CODE_RE = re.compile(r'```python\n?(.*?)```', re.DOTALL)
+_ANY_CODE_RE = re.compile(r'```\n?(.*?)```', re.DOTALL)
+
+# Additional safe builtins exposed to restricted code, built once at
+# import instead of literal-by-literal on every _build_globals call
+_STATIC_BUILTINS = {
+    # Types
+    'len': len,
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'list': list,
+    'dict': dict,
+    'tuple': tuple,
+    'set': set,
+    'frozenset': frozenset,
+    'bytes': bytes,
+    'bytearray': bytearray,
+
+    # Iteration
+    'range': range,
+    'enumerate': enumerate,
+    'zip': zip,
+    'map': map,
+    'filter': filter,
+    'reversed': reversed,
+    'iter': iter,
+    'next': next,
+
+    # Aggregation
+    'sorted': sorted,
+    'sum': sum,
+    'min': min,
+    'max': max,
+    'any': any,
+    'all': all,
+
+    # Math
+    'abs': abs,
+    'round': round,
+    'pow': pow,
+    'divmod': divmod,
+
+    # String/repr
+    'chr': chr,
+    'ord': ord,
+    'hex': hex,
+    'oct': oct,
+    'bin': bin,
+    'repr': repr,
+    'ascii': ascii,
+    'format': format,
+
+    # Type checking
+    'isinstance': isinstance,
+    'issubclass': issubclass,
+    'callable': callable,
+    'type': type,
+    'hasattr': hasattr,
+
+    # Constants
+    'True': True,
+    'False': False,
+    'None': None,
+}
+
+# Safe standard library modules, imported once at module load
+# These are read-only and don't allow file/network access
+_SAFE_MODULES = {
+    're': re,               # Regex (read-only)
+    'json': json,           # JSON parsing (read-only)
+    'math': math,           # Math functions
+    'datetime': datetime,   # Date parsing
+    'timedelta': timedelta, # Time deltas
+    'Counter': Counter,     # Counting helper
+    'defaultdict': defaultdict,  # Dict with defaults
+}
+
+
+@lru_cache(maxsize=512)
+def _compile(code: str) -> Any:
+    """
+    Compile code with RestrictedPython, caching by source text.
+
+    The AST transform + compile is the heaviest per-iteration CPU cost,
+    and LLMs re-emit near-identical scaffolding across iterations, so
+    repeats skip straight to exec.
+
+    Raises:
+        REPLError: If compilation fails
+    """
+    byte_code = compile_restricted_exec(code)
+
+    if byte_code.errors:
+        raise REPLError(f"Compilation error: {', '.join(byte_code.errors)}")
+
+    return byte_code.code
+
+
+@lru_cache(maxsize=512)
+def _compile_eval(source: str) -> Any:
+    """
+    Compile an expression with RestrictedPython, caching by source text.
+
+    Raises:
+        REPLError: If compilation fails
+    """
+    byte_code = compile_restricted_eval(source)
+
+    if byte_code.errors:
+        raise REPLError(f"Compilation error: {', '.join(byte_code.errors)}")
+
+    return byte_code.code
+
+
+class _Unsupported(Exception):
+    """Raised when the fast-path evaluator cannot handle a node."""
+    pass
+
+
+# Operators the fast-path evaluator understands
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+@lru_cache(maxsize=512)
+def _simple_assign(code: str) -> Optional[ast.Assign]:
+    """
+    Detect a lone `name = <expression>` statement, cached by source.
+
+    Underscore-prefixed targets are excluded: RestrictedPython forbids
+    them, and the fast path must never be more permissive than the full
+    path it bypasses.
+
+    Returns:
+        The Assign node, or None if the code is anything else
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    if (
+        len(tree.body) == 1
+        and isinstance(tree.body[0], ast.Assign)
+        and len(tree.body[0].targets) == 1
+        and isinstance(tree.body[0].targets[0], ast.Name)
+        and not tree.body[0].targets[0].id.startswith('_')
+    ):
+        return tree.body[0]
+
+    return None
+
+
+def _eval_simple(node: ast.expr, env: Dict[str, Any]) -> Any:
+    """
+    Evaluate a small expression AST directly against env.
+
+    Handles constants, names, arithmetic and subscripts/slices — the
+    shape of most single-assignment REPL steps like `x = 5 + 3` or
+    `chunk = context[:100]` — without the RestrictedPython compile +
+    exec machinery. Raises _Unsupported for anything richer so the
+    caller falls back to the full path.
+    """
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        # Underscore-prefixed names (e.g. __builtins__, guard hooks) are
+        # off limits under RestrictedPython; defer to the full path so
+        # it raises the same error it always has
+        if node.id.startswith('_'):
+            raise _Unsupported(node.id)
+        if node.id in env:
+            return env[node.id]
+        raise _Unsupported(node.id)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        return _BIN_OPS[type(node.op)](
+            _eval_simple(node.left, env),
+            _eval_simple(node.right, env),
+        )
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        return _UNARY_OPS[type(node.op)](_eval_simple(node.operand, env))
+    if isinstance(node, ast.Subscript):
+        obj = _eval_simple(node.value, env)
+        sl = node.slice
+        if isinstance(sl, ast.Slice):
+            return obj[slice(
+                _eval_simple(sl.lower, env) if sl.lower else None,
+                _eval_simple(sl.upper, env) if sl.upper else None,
+                _eval_simple(sl.step, env) if sl.step else None,
+            )]
+        return obj[_eval_simple(sl, env)]
+    raise _Unsupported(type(node).__name__)
+
+
+@lru_cache(maxsize=512)
+def _trailing_expression(code: str) -> Optional[str]:
+    """
+    Find a trailing top-level expression statement via the AST.
+
+    Replaces the old keyword-substring heuristic, which missed
+    comparisons (x == y), multi-line expressions and trailing comments,
+    and re-parsed the last line on every call.
+
+    Args:
+        code: Python source
+
+    Returns:
+        Unparsed source of the trailing expression, or None
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        return ast.unparse(tree.body[-1].value)
+
+    return None
+
+
 class REPLExecutor:
     """Safe Python code executor."""
 
@@ -27,6 +270,10 @@ class REPLExecutor:
         self.timeout = timeout
         self.max_output_chars = max_output_chars
 
+        # Restricted globals are identical for every execution, so build
+        # them once instead of re-copying dicts on each call
+        self._base_globals = self._build_globals()
+
     def execute(self, code: str, env: Dict[str, Any]) -> str:
         """
         Execute Python code in restricted environment.
@@ -47,64 +294,86 @@ class REPLExecutor:
         if not code.strip():
             return "No code to execute"
 
-        # Build restricted globals
-        restricted_globals = self._build_globals(env)
+        # Seed the environment with the restricted globals (built once in
+        # __init__). The env dict itself is the execution namespace: that
+        # keeps assignments visible to later iterations and lets nested
+        # scopes (comprehensions, functions) resolve names like `context`,
+        # which a separate locals dict cannot provide.
+        for key, value in self._base_globals.items():
+            env.setdefault(key, value)
 
-        # Capture stdout
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = io.StringIO()
+        # Drop any print collector left over from a previous execution so
+        # stale output isn't re-reported
+        env.pop('_print', None)
 
         try:
-            # Compile with RestrictedPython
-            byte_code = compile_restricted_exec(code)
-
-            if byte_code.errors:
-                raise REPLError(f"Compilation error: {', '.join(byte_code.errors)}")
+            # Fast path: a lone simple assignment is evaluated directly
+            # against env, skipping restricted compile + exec entirely.
+            # Runtime errors (e.g. 1 / 0) propagate to the handler below
+            # exactly as they would from exec.
+            assign = _simple_assign(code)
+            if assign is not None:
+                try:
+                    value = _eval_simple(assign.value, env)
+                except _Unsupported:
+                    pass  # Fall through to the full path
+                else:
+                    env[assign.targets[0].id] = value
+                    return "Code executed successfully (no output)"
+
+            # Compile with RestrictedPython (cached by source text)
+            code_obj = _compile(code)
 
             # Execute
-            exec(byte_code.code, restricted_globals, env)
-
-            # Get output from stdout
-            output = captured_output.getvalue()
-
-            # Get output from PrintCollector if available
-            if '_print' in env and hasattr(env['_print'], '__call__'):
-                # PrintCollector stores prints in its txt attribute
-                print_collector = env['_print']
-                if hasattr(print_collector, 'txt'):
-                    output += ''.join(print_collector.txt)
-
-            # Check if last line was an expression (try to get its value)
-            # This handles cases like: error_count (should return its value)
-            lines = code.strip().split('\n')
-            if lines:
-                last_line = lines[-1].strip()
-                # If last line is a simple expression (no assignment, no keyword)
-                if last_line and not any(kw in last_line for kw in ['=', 'import', 'def', 'class', 'if', 'for', 'while', 'with']):
-                    try:
-                        # Try to evaluate the last line as expression
-                        result = eval(last_line, restricted_globals, env)
-                        if result is not None:
-                            output += str(result) + '\n'
-                    except:
-                        pass  # Not an expression, ignore
-
-            if not output:
+            exec(code_obj, env)
+
+            # Restricted code routes print() through PrintCollector; no
+            # process-global stdout redirection is needed (and redirecting
+            # sys.stdout would not be safe with concurrent executions).
+            # Assemble output as a list of chunks — never via repeated str
+            # concatenation — and stop materializing once we have more than
+            # enough to fill the truncated reply; total_len keeps tracking
+            # the full size so the truncation notice stays accurate.
+            parts = []
+            total_len = 0
+            materialize_limit = self.max_output_chars + 1
+            print_collector = env.get('_print')
+            if print_collector is not None and hasattr(print_collector, 'txt'):
+                for chunk in print_collector.txt:
+                    total_len += len(chunk)
+                    if len(parts) == 0 or total_len - len(chunk) <= materialize_limit:
+                        parts.append(chunk)
+
+            # If the code ends in a bare expression, surface its value
+            # (handles cases like: error_count). Detection and the compiled
+            # expression are both cached by source text.
+            expr_src = _trailing_expression(code)
+            if expr_src is not None:
+                try:
+                    result = eval(_compile_eval(expr_src), env)
+                    if result is not None:
+                        chunk = str(result) + '\n'
+                        total_len += len(chunk)
+                        if total_len - len(chunk) <= materialize_limit:
+                            parts.append(chunk)
+                except Exception:
+                    pass  # Not evaluable (e.g. print target), ignore
+
+            if not total_len:
                 return "Code executed successfully (no output)"
 
+            output = ''.join(parts)
+
             # Truncate output if too long (as per paper: "truncated version of output")
-            if len(output) > self.max_output_chars:
+            if total_len > self.max_output_chars:
                 truncated = output[:self.max_output_chars]
-                return f"{truncated}\n\n[Output truncated: {len(output)} chars total, showing first {self.max_output_chars}]"
+                return f"{truncated}\n\n[Output truncated: {total_len} chars total, showing first {self.max_output_chars}]"
 
             return output.strip()
 
         except Exception as e:
             raise REPLError(f"Execution error: {str(e)}")
 
-        finally:
-            sys.stdout = old_stdout
-
     def _extract_code(self, text: str) -> str:
         """
         Extract code from markdown code blocks if present.
@@ -116,27 +385,16 @@ class REPLExecutor:
             Extracted code
         """
         # Check for markdown code blocks
-        if '```python' in text:
-            start = text.find('```python') + len('```python')
-            end = text.find('```', start)
-            if end != -1:
-                return text[start:end].strip()
-
-        if '```' in text:
-            start = text.find('```') + 3
-            end = text.find('```', start)
-            if end != -1:
-                return text[start:end].strip()
+        match = _PY_CODE_RE.search(text) or _ANY_CODE_RE.search(text)
+        if match:
+            return match.group(1).strip()
 
         return text
 
-    def _build_globals(self, env: Dict[str, Any]) -> Dict[str, Any]:
+    def _build_globals(self) -> Dict[str, Any]:
         """
         Build restricted globals for safe execution.
 
-        Args:
-            env: User environment
-
         Returns:
             Safe globals dict
         """
@@ -151,85 +409,10 @@ class REPLExecutor:
         restricted_globals['_getiter_'] = iter
         restricted_globals['_print_'] = PrintCollector
 
-        # Add additional safe builtins
-        restricted_globals.update({
-            # Types
-            'len': len,
-            'str': str,
-            'int': int,
-            'float': float,
-            'bool': bool,
-            'list': list,
-            'dict': dict,
-            'tuple': tuple,
-            'set': set,
-            'frozenset': frozenset,
-            'bytes': bytes,
-            'bytearray': bytearray,
-
-            # Iteration
-            'range': range,
-            'enumerate': enumerate,
-            'zip': zip,
-            'map': map,
-            'filter': filter,
-            'reversed': reversed,
-            'iter': iter,
-            'next': next,
-
-            # Aggregation
-            'sorted': sorted,
-            'sum': sum,
-            'min': min,
-            'max': max,
-            'any': any,
-            'all': all,
-
-            # Math
-            'abs': abs,
-            'round': round,
-            'pow': pow,
-            'divmod': divmod,
-
-            # String/repr
-            'chr': chr,
-            'ord': ord,
-            'hex': hex,
-            'oct': oct,
-            'bin': bin,
-            'repr': repr,
-            'ascii': ascii,
-            'format': format,
-
-            # Type checking
-            'isinstance': isinstance,
-            'issubclass': issubclass,
-            'callable': callable,
-            'type': type,
-            'hasattr': hasattr,
-
-            # Constants
-            'True': True,
-            'False': False,
-            'None': None,
-        })
-
-        # Add safe standard library modules
-        # These are read-only and don't allow file/network access
-        import re
-        import json
-        import math
-        from datetime import datetime, timedelta
-        from collections import Counter, defaultdict
-
-        restricted_globals.update({
-            're': re,               # Regex (read-only)
-            'json': json,           # JSON parsing (read-only)
-            'math': math,           # Math functions
-            'datetime': datetime,   # Date parsing
-            'timedelta': timedelta, # Time deltas
-            'Counter': Counter,     # Counting helper
-            'defaultdict': defaultdict,  # Dict with defaults
-        })
+        # Add additional safe builtins and stdlib modules (module-level
+        # tables, so this is two bulk updates rather than dozens of
+        # per-call dict writes)
+        restricted_globals.update(_STATIC_BUILTINS)
+        restricted_globals.update(_SAFE_MODULES)
 
         return restricted_globals
@@ -6,7 +6,9 @@ from typing import TypedDict, Optional, Any, Callable, Awaitable
 class Message(TypedDict):
     """LLM message format."""
     role: str
-    content: str
+    # Usually a plain string; Anthropic-style content-block lists are used
+    # when the system prompt is marked cacheable
+    content: Any
 
 
 class RLMConfig(TypedDict, total=False):
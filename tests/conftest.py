@@ -0,0 +1,186 @@
+"""Shared fixtures for RLM tests."""
+
+import asyncio
+import inspect
+import logging
+from dataclasses import dataclass
+
+import pytest
+
+from rlm import RLM
+
+
+@dataclass(frozen=True)
+class _MockMessage:
+    content: str
+
+
+@dataclass(frozen=True)
+class _MockChoice:
+    message: _MockMessage
+
+
+@dataclass(frozen=True)
+class MockResponse:
+    """Mock LLM response: plain dataclasses, no MagicMock machinery."""
+    choices: tuple
+
+    def __init__(self, content):
+        object.__setattr__(
+            self, 'choices', (_MockChoice(_MockMessage(content)),)
+        )
+
+
+class _FakeAcompletion:
+    """
+    Lightweight stand-in for litellm.acompletion.
+
+    Patched in once per session instead of entering a patch() context in
+    every test; records calls as plain (args, kwargs) tuples and serves
+    responses from a queue, a side_effect callable/iterator, or a fixed
+    return_value — the subset of the Mock API the tests actually use.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.queue = []
+        self.return_value = None
+        self.side_effect = None
+        self.calls = []
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.queue:
+            return self.queue.pop(0)
+        if self.side_effect is not None:
+            result = self.side_effect(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        return self.return_value
+
+    @property
+    def called(self):
+        return bool(self.calls)
+
+    @property
+    def call_count(self):
+        return len(self.calls)
+
+    @property
+    def call_args_list(self):
+        return self.calls
+
+    @property
+    def call_args(self):
+        return self.calls[-1] if self.calls else None
+
+
+@pytest.fixture(scope="session")
+def _litellm_shim():
+    """Patch rlm.core.litellm.acompletion once for the whole session."""
+    mp = pytest.MonkeyPatch()
+    fake = _FakeAcompletion()
+    mp.setattr('rlm.core.litellm.acompletion', fake)
+    yield fake
+    mp.undo()
+
+
+@pytest.fixture(autouse=True)
+def mock_litellm(_litellm_shim):
+    """Per-test view of the shared shim, reset between tests."""
+    _litellm_shim.reset()
+    yield _litellm_shim
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def _loop_debug():
+    """Enable asyncio debug mode so slow synchronous steps get logged."""
+    loop = asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = 0.2
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _fail_on_blocked_loop():
+    """
+    Fail any test during which the event loop was blocked.
+
+    asyncio debug mode logs 'Executing ... took N seconds' whenever a
+    callback holds the loop past slow_callback_duration; promoting that
+    to a failure catches regressions that reintroduce synchronous I/O
+    (e.g. a blocking litellm.completion call) on the async path.
+    """
+    records = []
+
+    class _Collector(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    logger = logging.getLogger('asyncio')
+    handler = _Collector()
+    logger.addHandler(handler)
+
+    yield
+
+    logger.removeHandler(handler)
+    blocked = [
+        record.getMessage() for record in records
+        if 'Executing' in record.getMessage() and 'took' in record.getMessage()
+    ]
+    if blocked:
+        pytest.fail(f"event loop blocked: {blocked[0]}")
+
+
+@pytest.fixture(autouse=True)
+def _instant_sleep(monkeypatch):
+    """
+    Make asyncio.sleep yield control without real delay.
+
+    Tests exercising backoff or simulated latency still interleave at
+    the await, but pay no wall-clock time; a synthetic-clock library
+    is not needed for that.
+    """
+    real_sleep = asyncio.sleep
+
+    async def fast_sleep(delay, result=None):
+        await real_sleep(0)
+        return result
+
+    monkeypatch.setattr(asyncio, 'sleep', fast_sleep)
+
+
+@pytest.fixture
+def mock_sequence():
+    """
+    Install a sequence of responses on a mock via an iterator.
+
+    unittest.mock copies and index-tracks a list side_effect on every
+    await; feeding responses through next() is O(1) per call and reads
+    the same at the call site.
+    """
+    def _install(mock, responses):
+        it = iter(responses)
+        mock.side_effect = lambda *args, **kwargs: next(it)
+
+    return _install
+
+
+@pytest.fixture
+def run_rlm(mock_litellm, mock_sequence):
+    """
+    Run a completion against a scripted sequence of responses.
+
+    Wraps the response strings in MockResponse, feeds them through the
+    shared shim and invokes acomplete — one call site instead of
+    per-test mock plumbing.
+    """
+    async def _run(responses, query, context, **rlm_kwargs):
+        mock_sequence(mock_litellm, [MockResponse(r) for r in responses])
+        rlm = RLM(model=rlm_kwargs.pop('model', 'test-model'), **rlm_kwargs)
+        return await rlm.acomplete(query, context)
+
+    return _run
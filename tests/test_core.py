@@ -1,21 +1,15 @@
 """Tests for core RLM."""
 
-import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
-from rlm import RLM, MaxIterationsError, MaxDepthError
-
+import asyncio
 
-class MockResponse:
-    """Mock LLM response."""
-    def __init__(self, content):
-        self.choices = [MagicMock(message=MagicMock(content=content))]
+import re as _re
 
+import pytest
+from unittest.mock import MagicMock
+from rlm import RLM, MaxIterationsError, MaxDepthError
+from rlm.core import _DEPTH
 
-@pytest.fixture
-def mock_litellm():
-    """Mock litellm.acompletion."""
-    with patch('rlm.core.litellm.acompletion') as mock:
-        yield mock
+from tests.conftest import MockResponse
 
 
 @pytest.mark.asyncio
@@ -31,13 +25,12 @@ async def test_simple_complete(mock_litellm):
 
 
 @pytest.mark.asyncio
-async def test_multi_step_complete(mock_litellm):
+async def test_multi_step_complete(mock_litellm, mock_sequence):
     """Test multi-step complete."""
-    responses = [
+    mock_sequence(mock_litellm, [
         MockResponse('x = context[:10]\nprint(x)'),
         MockResponse('FINAL("Done")'),
-    ]
-    mock_litellm.side_effect = responses
+    ])
 
     rlm = RLM(model="test-model")
     result = await rlm.acomplete("Test", "Hello World Test")
@@ -60,20 +53,23 @@ async def test_max_iterations_error(mock_litellm):
 @pytest.mark.asyncio
 async def test_max_depth_error(mock_litellm):
     """Test max depth exceeded."""
-    rlm = RLM(model="test-model", max_depth=2, _current_depth=2)
+    rlm = RLM(model="test-model", max_depth=2)
 
-    with pytest.raises(MaxDepthError):
-        await rlm.acomplete("Test", "Context")
+    token = _DEPTH.set(2)
+    try:
+        with pytest.raises(MaxDepthError):
+            await rlm.acomplete("Test", "Context")
+    finally:
+        _DEPTH.reset(token)
 
 
 @pytest.mark.asyncio
-async def test_final_var(mock_litellm):
+async def test_final_var(mock_litellm, mock_sequence):
     """Test FINAL_VAR extraction."""
-    responses = [
+    mock_sequence(mock_litellm, [
         MockResponse('result = "Test Answer"\nprint(result)'),
         MockResponse('FINAL_VAR(result)'),
-    ]
-    mock_litellm.side_effect = responses
+    ])
 
     rlm = RLM(model="test-model")
     result = await rlm.acomplete("Test", "Context")
@@ -82,13 +78,12 @@ async def test_final_var(mock_litellm):
 
 
 @pytest.mark.asyncio
-async def test_repl_error_handling(mock_litellm):
+async def test_repl_error_handling(mock_litellm, mock_sequence):
     """Test REPL error handling."""
-    responses = [
+    mock_sequence(mock_litellm, [
         MockResponse('x = 1 / 0'),  # This will cause error
         MockResponse('FINAL("Recovered")'),
-    ]
-    mock_litellm.side_effect = responses
+    ])
 
     rlm = RLM(model="test-model")
     result = await rlm.acomplete("Test", "Context")
@@ -97,13 +92,12 @@ async def test_repl_error_handling(mock_litellm):
 
 
 @pytest.mark.asyncio
-async def test_context_operations(mock_litellm):
+async def test_context_operations(mock_litellm, mock_sequence):
     """Test context operations in REPL."""
-    responses = [
+    mock_sequence(mock_litellm, [
         MockResponse('first_10 = context[:10]'),
         MockResponse('FINAL_VAR(first_10)'),
-    ]
-    mock_litellm.side_effect = responses
+    ])
 
     rlm = RLM(model="test-model")
     result = await rlm.acomplete("Get first 10 chars", "Hello World Example")
@@ -111,47 +105,54 @@ async def test_context_operations(mock_litellm):
     assert result == "Hello Worl"
 
 
-def test_sync_complete():
+def test_context_stored_by_reference():
+    """Test that the REPL env aliases the context string, not a copy."""
+    rlm = RLM(model="test-model")
+    context = "A" * 100_000
+
+    env = rlm._build_repl_env("Test", context)
+
+    # One 100KB string shared by reference; iterations reuse this env,
+    # so no per-iteration copies are made either
+    assert env['context'] is context
+
+
+def test_sync_complete(mock_litellm):
     """Test sync complete wrapper."""
-    with patch('rlm.core.litellm.acompletion') as mock:
-        mock.return_value = MockResponse('FINAL("Sync result")')
+    mock_litellm.return_value = MockResponse('FINAL("Sync result")')
 
-        rlm = RLM(model="test-model")
-        result = rlm.complete("Test", "Context")
+    rlm = RLM(model="test-model")
+    result = rlm.complete("Test", "Context")
 
-        assert result == "Sync result"
+    assert result == "Sync result"
 
 
-@pytest.mark.asyncio
-async def test_two_models(mock_litellm):
+def test_two_models(mock_litellm):
     """Test using different models for root and recursive."""
     mock_litellm.return_value = MockResponse('FINAL("Answer")')
 
     rlm = RLM(
         model="expensive-model",
         recursive_model="cheap-model",
-        _current_depth=0
     )
 
-    await rlm.acomplete("Test", "Context")
+    rlm.complete("Test", "Context")
 
     # First call should use expensive model
     call_args = mock_litellm.call_args_list[0]
     assert call_args[1]['model'] == "expensive-model"
 
 
-@pytest.mark.asyncio
-async def test_stats(mock_litellm):
+def test_stats(mock_litellm, mock_sequence):
     """Test statistics tracking."""
-    responses = [
+    mock_sequence(mock_litellm, [
         MockResponse('x = 1'),
         MockResponse('y = 2'),
         MockResponse('FINAL("Done")'),
-    ]
-    mock_litellm.side_effect = responses
+    ])
 
     rlm = RLM(model="test-model")
-    await rlm.acomplete("Test", "Context")
+    rlm.complete("Test", "Context")
 
     stats = rlm.stats
     assert stats['llm_calls'] == 3
@@ -160,7 +161,188 @@ async def test_stats(mock_litellm):
 
 
 @pytest.mark.asyncio
-async def test_api_base_and_key(mock_litellm):
+async def test_nested_recursion(mock_litellm):
+    """Test recursion two levels deep through the sync REPL wrappers."""
+    calls = {}
+
+    def respond(*args, **kwargs):
+        system = kwargs['messages'][0]['content']
+        depth = int(_re.search(r'Depth: (\d+)', system).group(1))
+        calls[depth] = calls.get(depth, 0) + 1
+        if depth < 2 and calls[depth] == 1:
+            return MockResponse('sub = recursive_llm("sub question", context[:10])')
+        if depth < 2:
+            return MockResponse('FINAL_VAR(sub)')
+        return MockResponse('FINAL("depth2 answer")')
+
+    mock_litellm.side_effect = respond
+
+    rlm = RLM(model="test-model", max_depth=5)
+    result = await rlm.acomplete("Test", "A" * 40)
+
+    # The answer from depth 2 must surface through both recursion hops;
+    # depth 1's REPL runs on the background loop's thread, so its own
+    # recursive call must not be scheduled back onto that loop
+    assert result == "depth2 answer"
+    assert calls == {0: 2, 1: 2, 2: 1}
+
+
+def _stream_chunk(text):
+    chunk = MagicMock()
+    chunk.choices[0].delta.content = text
+    return chunk
+
+
+class FakeStream:
+    """Async iterator of chunks that records consumption."""
+    def __init__(self, texts):
+        self._texts = iter(texts)
+        self.consumed = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            text = next(self._texts)
+        except StopIteration:
+            raise StopAsyncIteration
+        self.consumed += 1
+        return _stream_chunk(text)
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_recursion_with_binary_context(mock_litellm):
+    """Test recursing on a slice of a bytes context."""
+    calls = {}
+
+    def respond(*args, **kwargs):
+        system = kwargs['messages'][0]['content']
+        depth = int(_re.search(r'Depth: (\d+)', system).group(1))
+        calls[depth] = calls.get(depth, 0) + 1
+        if depth == 0 and calls[0] == 1:
+            return MockResponse('sub = recursive_llm("sub question", context[:10])')
+        if depth == 0:
+            return MockResponse('FINAL_VAR(sub)')
+        return MockResponse('FINAL("binary sub answer")')
+
+    mock_litellm.side_effect = respond
+
+    rlm = RLM(model="test-model", context_binary=True)
+    result = await rlm.acomplete("Test", "A" * 40)
+
+    # The sub-context is a bytes slice; the sub-completion must accept
+    # it without re-encoding
+    assert result == "binary sub answer"
+    assert calls == {0: 2, 1: 1}
+
+
+@pytest.mark.asyncio
+async def test_stream_short_circuit(mock_litellm):
+    """Test streaming stops reading once FINAL is complete."""
+    stream = FakeStream(['FINAL("Early")', ' trailing', ' tokens', ' wasted'])
+    mock_litellm.side_effect = lambda *args, **kwargs: stream
+
+    rlm = RLM(model="test-model", stream=True)
+    result = await rlm.acomplete("Test", "Context")
+
+    assert result == "Early"
+    # The answer was complete after the first chunk; the rest were
+    # never pulled and the stream was closed
+    assert stream.consumed == 1
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_waits_for_closing_quotes(mock_litellm):
+    """Test streaming does not stop inside a triple-quoted answer."""
+    stream = FakeStream([
+        'FINAL("""Line 1\n',
+        'Line 2""")',
+        ' trailing',
+    ])
+    mock_litellm.side_effect = lambda *args, **kwargs: stream
+
+    rlm = RLM(model="test-model", stream=True)
+    result = await rlm.acomplete("Test", "Context")
+
+    # The first chunk opens the answer but does not close it; the stream
+    # must keep reading until the closing quotes arrive
+    assert result == "Line 1\nLine 2"
+    assert stream.consumed == 2
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_stable_across_iterations(mock_litellm, mock_sequence):
+    """Test that the system message stays identical across iterations.
+
+    Provider-side prefix caching only hits when the prefix is
+    byte-for-byte identical, so the loop must append to messages without
+    ever rebuilding the system content.
+    """
+    mock_sequence(mock_litellm, [
+        MockResponse('x = len(context)'),
+        MockResponse('y = x + 1'),
+        MockResponse('FINAL("Done")'),
+    ])
+
+    rlm = RLM(model="test-model")
+    await rlm.acomplete("Test", "Context")
+
+    assert mock_litellm.call_count == 3
+    contents = [
+        kwargs['messages'][0]['content']
+        for _, kwargs in mock_litellm.call_args_list
+    ]
+    assert all(content is contents[0] for content in contents)
+
+
+@pytest.mark.asyncio
+async def test_response_cache_hit(mock_litellm):
+    """Test that identical deterministic calls hit the response cache."""
+    mock_litellm.return_value = MockResponse('FINAL("Cached")')
+
+    rlm = RLM(model="test-model", cache={}, temperature=0)
+
+    first = await rlm.acomplete("Test", "Context")
+    second = await rlm.acomplete("Test", "Context")
+
+    assert first == second == "Cached"
+    # Second run is served from the cache, not the API
+    assert mock_litellm.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_concurrency(mock_litellm):
+    """Test that batched completions overlap instead of running serially."""
+    in_flight = 0
+    peak = 0
+
+    async def slow_response(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)  # Instant under _instant_sleep, still yields
+        in_flight -= 1
+        return MockResponse('FINAL("Done")')
+
+    mock_litellm.side_effect = slow_response
+
+    rlm = RLM(model="test-model", max_concurrency=8)
+    results = await rlm.acomplete_batch([("Test", f"Context {i}") for i in range(8)])
+
+    assert results == ["Done"] * 8
+    assert mock_litellm.call_count == 8
+    # Serial execution would never have more than one call in flight
+    assert peak > 1
+
+
+def test_api_base_and_key(mock_litellm):
     """Test API base and key passing."""
     mock_litellm.return_value = MockResponse('FINAL("Answer")')
 
@@ -170,7 +352,7 @@ async def test_api_base_and_key(mock_litellm):
         api_key="test-key"
     )
 
-    await rlm.acomplete("Test", "Context")
+    rlm.complete("Test", "Context")
 
     call_kwargs = mock_litellm.call_args[1]
     assert call_kwargs['api_base'] == "http://localhost:8000"
@@ -104,6 +104,15 @@ def test_empty_code(repl):
     assert "No code" in result
 
 
+def test_underscore_names_rejected(repl):
+    """Test that underscore-prefixed names stay forbidden."""
+    env = {}
+    with pytest.raises(REPLError):
+        repl.execute("x = __builtins__", env)
+    with pytest.raises(REPLError):
+        repl.execute("_x = 1", env)
+
+
 def test_syntax_error(repl):
     """Test syntax error handling."""
     env = {}